@@ -1,15 +1,145 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import orjson
 import os
-import json
-import traceback
+import atexit
+import queue
+import threading
+import time
+import logging
+
+try:
+    from google.auth.transport.requests import AuthorizedSession
+    from google.oauth2.service_account import Credentials
+    _GOOGLE_AUTH_AVAILABLE = True
+except ImportError:
+    _GOOGLE_AUTH_AVAILABLE = False
+
+class OrjsonProvider(JSONProvider):
+    """Route request.json and jsonify through orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Configuration
 GOOGLE_SHEET_ID = os.environ.get("GOOGLE_SHEET_ID")
 CREDENTIALS_JSON = os.environ.get("GOOGLE_CREDENTIALS_JSON")
+# Parse the service-account JSON once at startup rather than on every write
+try:
+    _CREDS_DICT = orjson.loads(CREDENTIALS_JSON) if CREDENTIALS_JSON else None
+except ValueError as e:
+    app.logger.error("Failed to parse GOOGLE_CREDENTIALS_JSON: %s", e)
+    _CREDS_DICT = None
+
+SHEETS_WRITE_MAX_RETRIES = int(os.environ.get("SHEETS_WRITE_MAX_RETRIES", 5))
+SHEETS_WRITE_RETRY_DELAY = float(os.environ.get("SHEETS_WRITE_RETRY_DELAY", 10))
+# One writer keeps rows in arrival order and lets a burst coalesce into a single values.append.
+# Each extra writer runs its own batch window, so with more than one a burst is split across
+# concurrent appends and rows can land out of order; only raise it if appends can't keep up.
+SHEETS_WRITER_THREADS = int(os.environ.get("SHEETS_WRITER_THREADS", 1))
+SHEETS_BATCH_MAX_ROWS = int(os.environ.get("SHEETS_BATCH_MAX_ROWS", 50))
+SHEETS_BATCH_WINDOW = float(os.environ.get("SHEETS_BATCH_WINDOW", 0.5))
+# How long shutdown waits for queued and in-flight rows; keep it under gunicorn's graceful timeout
+SHEETS_SHUTDOWN_TIMEOUT = float(os.environ.get("SHEETS_SHUTDOWN_TIMEOUT", 25))
+
+SHEETS_APPEND_URL = f"https://sheets.googleapis.com/v4/spreadsheets/{GOOGLE_SHEET_ID}/values/A1:append"
+
+# Authorized keep-alive session shared by the writer threads; google-auth refreshes
+# the access token ahead of expiry on its own
+_AUTHED_SESSION = None
+if _GOOGLE_AUTH_AVAILABLE and _CREDS_DICT:
+    try:
+        _AUTHED_SESSION = AuthorizedSession(Credentials.from_service_account_info(
+            _CREDS_DICT, scopes=["https://www.googleapis.com/auth/spreadsheets"]
+        ))
+    except ValueError as e:
+        app.logger.error("Failed to load Google service account credentials: %s", e)
+
+# Rows accepted by the webhook and waiting to be appended by the background writer
+_write_queue = queue.Queue()
+# Set at shutdown so writers stop waiting out the batch window
+_stopping = threading.Event()
+
+def write_to_gsheet(rows):
+    # Direct values.append call: one HTTP request, no spreadsheet/worksheet metadata lookups.
+    # A bare "A1" range targets the first sheet, matching the previous sh.sheet1 behaviour.
+    response = _AUTHED_SESSION.post(
+        SHEETS_APPEND_URL,
+        params={"valueInputOption": "USER_ENTERED"},
+        headers={"Content-Type": "application/json"},
+        data=orjson.dumps({"values": rows}),
+        timeout=30
+    )
+    response.raise_for_status()
+    app.logger.debug("values.append response: %s", orjson.loads(response.content).get("updates"))
+    app.logger.info("Successfully wrote %d row(s): %s", len(rows), rows)
+
+def _next_batch():
+    # Block for one row, then coalesce whatever else arrives within the batch window
+    rows = [_write_queue.get()]
+    deadline = time.monotonic() + SHEETS_BATCH_WINDOW
+    while len(rows) < SHEETS_BATCH_MAX_ROWS:
+        # At shutdown take only what is already queued
+        remaining = 0 if _stopping.is_set() else deadline - time.monotonic()
+        try:
+            rows.append(_write_queue.get(timeout=remaining) if remaining > 0 else _write_queue.get_nowait())
+        except queue.Empty:
+            break
+    return rows
+
+def _append_with_retries(rows):
+    """Append rows, retrying failures; delivery is at-least-once.
+
+    values.append is not idempotent: if a request times out after Sheets has applied it, the retry
+    appends the same rows again. Duplicates are preferred over dropping a Jira event.
+    """
+    for attempt in range(1, SHEETS_WRITE_MAX_RETRIES + 1):
+        try:
+            write_to_gsheet(rows)
+            return
+        except Exception:
+            app.logger.exception("Error appending %d row(s) (attempt %d/%d)",
+                                 len(rows), attempt, SHEETS_WRITE_MAX_RETRIES)
+            if attempt < SHEETS_WRITE_MAX_RETRIES:
+                time.sleep(SHEETS_WRITE_RETRY_DELAY)
+    app.logger.error("Giving up on rows after %d attempts: %s", SHEETS_WRITE_MAX_RETRIES, rows)
+
+def _sheets_writer():
+    while True:
+        rows = _next_batch()
+        try:
+            _append_with_retries(rows)
+        finally:
+            for _ in rows:
+                _write_queue.task_done()
+
+def flush_now():
+    """Wait for the writers to append every accepted row, including batches already mid-window or mid-retry."""
+    _stopping.set()
+    with _write_queue.all_tasks_done:
+        drained = _write_queue.all_tasks_done.wait_for(
+            lambda: not _write_queue.unfinished_tasks, timeout=SHEETS_SHUTDOWN_TIMEOUT
+        )
+    if not drained:
+        app.logger.error("Shutting down with %d row(s) not yet written to Sheets", _write_queue.unfinished_tasks)
+
+atexit.register(flush_now)
+
+for _i in range(max(1, SHEETS_WRITER_THREADS)):
+    threading.Thread(target=_sheets_writer, name=f"sheets-writer-{_i}", daemon=True).start()
 
 @app.route("/jira-to-gsheet", methods=["POST", "OPTIONS"])
 def jira_to_gsheet():
@@ -26,71 +156,41 @@ def jira_to_gsheet():
         feature_impact = fields.get("featureImpact", "")
         feature_impact_link = fields.get("featureImpactLink", "")
 
-        print("Received Jira webhook:")
-        print(json.dumps(data, indent=2))
-        print(f"Extracted: {jira_id} | {summary}")
+        app.logger.debug("Jira webhook payload: %s", data)
+        app.logger.info("Received Jira webhook: %s | %s", jira_id, summary)
 
-        if not CREDENTIALS_JSON:
-            print("GOOGLE_CREDENTIALS_JSON not found.")
+        if not _GOOGLE_AUTH_AVAILABLE:
+            app.logger.warning("Google auth libraries not installed.")
             return jsonify({
                 "status": "warning",
-                "message": "Missing Google Sheets credentials"
+                "message": "Google Sheets client libraries not available"
             }), 200
 
-        # Google Sheets write sequence
-        import gspread
-        from oauth2client.service_account import ServiceAccountCredentials
-
-        scope = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds_dict = json.loads(CREDENTIALS_JSON)
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-
-        print("Authenticating with Google Sheets...")
-        gc = gspread.authorize(creds)
+        if _AUTHED_SESSION is None:
+            app.logger.warning("GOOGLE_CREDENTIALS_JSON not found or invalid.")
+            return jsonify({
+                "status": "warning",
+                "message": "Missing or invalid Google Sheets credentials"
+            }), 200
 
         if not GOOGLE_SHEET_ID:
             raise ValueError("GOOGLE_SHEET_ID environment variable missing")
 
-        try:
-            sh = gc.open_by_key(GOOGLE_SHEET_ID)
-            print(f"Opened spreadsheet: {sh.title} ({GOOGLE_SHEET_ID})")
-        except Exception as e:
-            print("Failed to open spreadsheet by ID")
-            raise
-
-        try:
-            worksheet = sh.sheet1
-            print(f"Using worksheet: {worksheet.title}")
-        except Exception:
-            print("Could not access sheet1, attempting first worksheet fallback...")
-            worksheet = sh.get_worksheet(0)
-
-        try:
-            new_row = [jira_id, summary, priority, justification, feature_impact, feature_impact_link]
-            response = worksheet.append_row(new_row, value_input_option="USER_ENTERED")
-            print(f"append_row() response: {response}")
-            print(f"Successfully wrote row: {new_row}")
-            return jsonify({"status": "success", "message": "Row written", "row": new_row}), 200
-        except Exception as e:
-            print("Error appending row:")
-            traceback.print_exc()
-            return jsonify({
-                "status": "error",
-                "message": f"append_row() failed: {str(e)}"
-            }), 500
+        # Google Sheets write happens on the background writer thread
+        new_row = [jira_id, summary, priority, justification, feature_impact, feature_impact_link]
+        _write_queue.put(new_row)
+        app.logger.debug("Queued row for writing: %s", new_row)
+        return jsonify({"status": "queued", "message": "Row queued", "row": new_row}), 202
 
     except Exception as e:
-        print("Uncaught error in jira_to_gsheet:")
-        traceback.print_exc()
+        app.logger.exception("Uncaught error in jira_to_gsheet")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route("/", methods=["GET"])
 def health():
     return jsonify({"status": "running", "message": "Jira webhook service active"}), 200
 
+# Local development only; production runs under gunicorn with gevent workers (see Procfile)
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
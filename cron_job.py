@@ -21,7 +21,9 @@ if __name__ == "__main__":
     logging.info("=====================================")
     
     try:
-        process_all_feedback()
+        if not process_all_feedback():
+            logging.error("Feedback processing failed")
+            sys.exit(1)
         logging.info("Feedback processing completed successfully")
         sys.exit(0)
     except Exception as e:
@@ -1,295 +1,596 @@
 import os
+import atexit
+import functools
 import gspread
 from google.oauth2.service_account import Credentials
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import queue
+import re
+import string
 import sys
-import traceback
+import threading
+import time
 
+# Records are formatted by the QueueHandler on the calling thread and written to stdout and the
+# log file by a background listener, so worker threads never block on console or disk I/O
+_log_queue = queue.Queue(-1)
+_log_handlers = [logging.StreamHandler(sys.stdout)]
+# One rotating file instead of a new file per run; delay=True means a run that logs nothing creates nothing.
+# Set LOG_FILE to an empty string to log to stdout only.
+LOG_FILE = os.environ.get('LOG_FILE', 'llm_evaluation.log')
+if LOG_FILE:
+    _log_handlers.append(RotatingFileHandler(LOG_FILE, maxBytes=10_000_000, backupCount=3, delay=True))
+_log_listener = QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(f'llm_evaluation_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
 GOOGLE_SHEET = os.environ.get('GOOGLE_SHEET_NAME', 'YOUR_SHEET_NAME')
+GOOGLE_SHEET_ID = os.environ.get('GOOGLE_SHEET_ID')
 CREDENTIALS_JSON = os.environ.get('GOOGLE_CREDENTIALS_JSON') or os.environ.get('GOOGLE_CREDS_JSON')
 OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
 OPENROUTER_MODEL = os.environ.get('OPENROUTER_MODEL', 'openai/gpt-4o')
 YOUR_SITE_URL = os.environ.get('SITE_URL', 'https://yourapp.com')
 YOUR_SITE_NAME = os.environ.get('SITE_NAME', 'Jira Feedback Processor')
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+LLM_MAX_TOKENS = int(os.environ.get('LLM_MAX_TOKENS', 180))
+LLM_TEMPERATURE = float(os.environ.get('LLM_TEMPERATURE', 0.2))
+FORCE_REPROCESS = os.environ.get('FORCE_REPROCESS', '').lower() in ('1', 'true', 'yes')
+WRITE_BATCH_SIZE = int(os.environ.get('WRITE_BATCH_SIZE', 100))
+# Longest a finished evaluation waits for a full batch; at the default that is at most 6 writes a minute
+WRITE_FLUSH_INTERVAL = float(os.environ.get('WRITE_FLUSH_INTERVAL', 10))
+LLM_WORKERS = int(os.environ.get('LLM_WORKERS', 16))
+# Client-side cap on OpenRouter calls across all workers, retried attempts included; 0 disables it
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get('LLM_REQUESTS_PER_MINUTE', 0))
+# Rows packed into one chat completion; raising it trades requests-per-minute for tokens-per-request
+ROWS_PER_REQUEST = max(1, int(os.environ.get('ROWS_PER_REQUEST', 1)))
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+# Longest single wait between HTTP retries, whether from backoff or a server's Retry-After header
+RETRY_MAX_WAIT = float(os.environ.get('RETRY_MAX_WAIT', 30))
 
-logger.info("=" * 80)
-logger.info("LLM FEEDBACK EVALUATION SERVICE STARTED")
-logger.info("=" * 80)
-logger.info(f"Configuration:")
-logger.info(f"  - Google Sheet: {GOOGLE_SHEET}")
-logger.info(f"  - OpenRouter Model: {OPENROUTER_MODEL}")
-logger.info(f"  - OpenRouter API Key: {'✓ Configured' if OPENROUTER_API_KEY else '✗ Missing'}")
-logger.info(f"  - Google Credentials: {'✓ Configured' if CREDENTIALS_JSON else '✗ Missing'}")
-logger.info("=" * 80)
+class CappedRetry(Retry):
+    """urllib3 Retry whose Retry-After waits are capped like its backoff, so one bad header can't stall a worker."""
 
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.backoff_max)
+
+class OpenRouterRetry(CappedRetry):
+    """CappedRetry that takes a LLM_REQUESTS_PER_MINUTE slot before every retried attempt."""
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        wait_for_request_slot()
+
+# One keep-alive session for all OpenRouter calls so the TLS handshake is paid once per run
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+    "HTTP-Referer": YOUR_SITE_URL,
+    "X-Title": YOUR_SITE_NAME,
+    "Content-Type": "application/json"
+})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    # Every LLM worker thread must be able to park its connection for reuse
+    pool_maxsize=max(32, LLM_WORKERS),
+    max_retries=OpenRouterRetry(
+        total=3,
+        backoff_factor=0.5,
+        backoff_max=RETRY_MAX_WAIT,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
+        raise_on_status=False
+    )
+))
+
+PROMPT_TEMPLATE = """Reflexive evaluation of Jira feature prioritization.
+
+Jira ID: {jira_id}
+Jira Summary: {summary}
+STAR Priority: {priority}
+Priority Rationale: {justification}
+Feature Impact: {feature_impact}
+Task: 
+- Write 2 sentences (max 100 words) describing any significant deviation between STAR Priority/Rationale and actual Feature Impact, and any learnings from this.
+- Do not add any headings. Do not elaborate further. Do not repeat inputs."""
+# The row fields that appear in the prompt; rows equal on all of them get identical prompts
+PROMPT_FIELDS = tuple(field for _, field, _, _ in string.Formatter().parse(PROMPT_TEMPLATE) if field)
+
+# Used when ROWS_PER_REQUEST > 1: the per-row prompts are numbered and the model answers each under
+# the same "### k" marker. The embedded prompts still say "no headings", so the header carves out the markers.
+PACKED_PROMPT_HEADER = """Answer each of the following {count} numbered evaluations independently and in order.
+Start each answer on its own line with "### <number>" (for example "### 1"), then give only that evaluation's answer.
+These "### <number>" lines are required even though each evaluation says not to add headings; add no other headings.
+
+"""
+# Digits must sit on the marker line itself, so a bare "###" followed by a numbered line is not a marker
+_PACKED_ANSWER_RE = re.compile(r'^###[ \t]*(\d+)[.:)]?[ \t]*', re.M)
+
+REPORT_HEADER = (
+    "<html><head><meta charset='UTF-8'><title>Reflexive Summary</title></head><body>\n"
+    "<h1>LLM Reflexive Prioritization Evaluation Report</h1><table border='1' cellpadding='6' cellspacing='0'>\n"
+    "<tr style='background:#cacaca'><th>Jira ID</th><th>Jira Summary</th><th>STAR Priority</th><th>Priority Rationale</th><th>Feature Impact</th><th>Feature Impact Link</th><th>Reflexive Summary</th></tr>\n"
+)
+REPORT_ROW_TEMPLATE = (
+    "<tr><td>{jira_id}</td>"
+    "<td>{summary}</td>"
+    "<td>{priority}</td>"
+    "<td>{justification}</td>"
+    "<td>{feature_impact}</td>"
+    "<td>{feature_impact_link}</td>"
+    "<td>{reflexive_summary}</td></tr>\n"
+)
+REPORT_FOOTER = "</table></body></html>"
+# Single C-level pass per cell: escape markup and turn newlines into line breaks
+_HTML_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '\n': '<br>'})
+
+# Parse the service-account JSON and build the credentials once per process
+_CREDS = None
 try:
     if CREDENTIALS_JSON:
-        creds_dict_debug = json.loads(CREDENTIALS_JSON)
-        logger.info(f"[DEBUG] Parsed GOOGLE_CREDENTIALS_JSON, client_email: {creds_dict_debug.get('client_email', 'N/A')}")
+        _creds_dict = orjson.loads(CREDENTIALS_JSON)
+        if os.environ.get('DEBUG_CREDS'):
+            # Opt-in: the service account's email is what the sheet must be shared with
+            logger.info("Parsed GOOGLE_CREDENTIALS_JSON, client_email: %s", _creds_dict.get('client_email', 'N/A'))
+        requested_scopes = ['https://www.googleapis.com/auth/spreadsheets']
+        if not GOOGLE_SHEET_ID:
+            # Opening by title is a Drive file search, which needs read-only Drive metadata access
+            requested_scopes.append('https://www.googleapis.com/auth/drive.metadata.readonly')
+        _CREDS = Credentials.from_service_account_info(_creds_dict, scopes=requested_scopes)
     else:
-        logger.error("[DEBUG] GOOGLE_CREDENTIALS_JSON not available for debug")
+        logger.error("GOOGLE_CREDENTIALS_JSON not available")
 except Exception as e:
-    logger.error(f"[DEBUG] Failed to parse GOOGLE_CREDENTIALS_JSON: {e}")
+    logger.error("Failed to parse GOOGLE_CREDENTIALS_JSON: %s", e)
 
-def get_google_sheets_client():
+def missing_config():
+    """Names of required settings that are unset or unusable, checked before any Sheets or LLM I/O."""
+    missing = []
+    if not OPENROUTER_API_KEY:
+        missing.append('OPENROUTER_API_KEY')
+    if _CREDS is None:
+        missing.append('GOOGLE_CREDENTIALS_JSON')
+    return missing
+
+def log_configuration():
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info("=" * 80)
+    logger.info("LLM FEEDBACK EVALUATION SERVICE STARTED")
+    logger.info("=" * 80)
+    logger.info("Configuration:")
+    logger.info("  - Google Sheet: %s", GOOGLE_SHEET_ID or GOOGLE_SHEET)
+    logger.info("  - OpenRouter Model: %s", OPENROUTER_MODEL)
+    logger.info("  - Rows per request: %d", ROWS_PER_REQUEST)
+    logger.info("  - Requests per minute: %s", LLM_REQUESTS_PER_MINUTE or 'unlimited')
+    logger.info("  - OpenRouter API Key: %s", '✓ Configured' if OPENROUTER_API_KEY else '✗ Missing')
+    logger.info("  - Google Credentials: %s", '✓ Configured' if CREDENTIALS_JSON else '✗ Missing')
+    logger.info("=" * 80)
+
+@functools.lru_cache(maxsize=1)
+def _authorize_google_sheets_client():
     logger.info("Attempting to authorize Google Sheets client...")
-    if not CREDENTIALS_JSON:
-        logger.error("GOOGLE_CREDENTIALS_JSON not configured")
+    client = gspread.authorize(_CREDS)
+    # Back off and retry rate-limited (429) and transient 5xx Sheets responses instead of
+    # failing the whole run; gspread 6 keeps its session on http_client, older releases on the client
+    getattr(client, 'http_client', client).session.mount("https://", HTTPAdapter(
+        max_retries=CappedRetry(
+            total=5,
+            backoff_factor=0.8,
+            backoff_max=RETRY_MAX_WAIT,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST", "PUT"],
+            raise_on_status=False
+        )
+    ))
+    logger.info("✓ Successfully authorized Google Sheets client")
+    return client
+
+def get_google_sheets_client():
+    if _CREDS is None:
+        logger.error("GOOGLE_CREDENTIALS_JSON not configured or invalid")
         return None
     try:
-        creds_dict = json.loads(CREDENTIALS_JSON)
-        requested_scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=requested_scopes)
-        client = gspread.authorize(creds)
-        logger.info("✓ Successfully authorized Google Sheets client")
-        return client
+        return _authorize_google_sheets_client()
     except Exception as e:
-        logger.error(f"Error authorizing Google Sheets: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error authorizing Google Sheets: %s", e)
         return None
 
-def read_feedback_rows():
-    logger.info("=" * 80)
-    logger.info("READING ALL FEEDBACK ROWS FROM GOOGLE SHEETS")
-    logger.info("=" * 80)
+@functools.lru_cache(maxsize=1)
+def _open_feedback_worksheet(client):
+    sh = client.open_by_key(GOOGLE_SHEET_ID) if GOOGLE_SHEET_ID else client.open(GOOGLE_SHEET)
+    return sh.get_worksheet(0)
+
+def get_feedback_worksheet():
     client = get_google_sheets_client()
     if not client:
-        return []
+        return None
+    return _open_feedback_worksheet(client)
+
+def is_error_evaluation(text):
+    """True for blank summaries and the error strings evaluate_individual_feedback returns."""
+    return not text or text.startswith(('Error:', 'API Error:'))
+
+def read_feedback_rows(worksheet):
+    logger.info("Reading feedback rows from Google Sheets")
     try:
-        sh = client.open(GOOGLE_SHEET)
-        worksheet = sh.get_worksheet(0)
-        all_rows = worksheet.get_all_values()
-        logger.info(f"✓ Retrieved {len(all_rows)} total rows")
-        if len(all_rows) < 2:
+        # Columns A-F feed the prompt; G/H carry the stored summary and wasProcessed flag.
+        # Skip the header row and anything right of the timestamp column.
+        data_rows = worksheet.get('A2:I')
+        logger.info("✓ Retrieved %d data rows", len(data_rows))
+        if not data_rows:
             logger.warning("No data rows found in sheet")
             return []
-        data_rows = all_rows[1:]
         rows_to_process = []
         for idx, row in enumerate(data_rows, start=2):
-            while len(row) < 9:
-                row.append('')
-            jira_id = row[0].strip() if row[0] else ''
-            summary = row[1].strip() if row[1] else ''
-            priority = row[2].strip() if row[2] else ''
-            justification = row[3].strip() if row[3] else ''
-            feature_impact = row[4].strip() if row[4] else ''
-            feature_impact_link = row[5].strip() if row[5] else ''
-            if jira_id and feature_impact:
-                rows_to_process.append({
-                    'row_index': idx,
-                    'jira_id': jira_id,
-                    'summary': summary,
-                    'priority': priority,
-                    'justification': justification,
-                    'feature_impact': feature_impact,
-                    'feature_impact_link': feature_impact_link
-                })
-        logger.info(f"\nFound {len(rows_to_process)} rows to process")
-        logger.info("=" * 80)
+            # Rows without a Jira ID or Feature Impact are skipped before any padding or stripping
+            if len(row) < 5 or not (row[0] and row[4]):
+                continue
+            row = row + [''] * (9 - len(row))
+            jira_id, summary, priority, justification, feature_impact, feature_impact_link, stored_summary, processed_flag = (
+                cell.strip() for cell in row[:8]
+            )
+            if not (jira_id and feature_impact):
+                continue
+            # Done only if flagged Processed with a real stored summary, so failed evaluations get retried
+            was_processed = (
+                not FORCE_REPROCESS
+                and processed_flag.lower() == 'processed'
+                and not is_error_evaluation(stored_summary)
+            )
+            rows_to_process.append({
+                'row_index': idx,
+                'jira_id': jira_id,
+                'summary': summary,
+                'priority': priority,
+                'justification': justification,
+                'feature_impact': feature_impact,
+                'feature_impact_link': feature_impact_link,
+                'was_processed': was_processed,
+                'reflexive_summary': stored_summary if was_processed else ''
+            })
+        logger.info("Found %d rows to process", len(rows_to_process))
         return rows_to_process
     except Exception as e:
-        logger.error(f"Error reading feedback rows: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error reading feedback rows: %s", e)
         return []
 
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+def wait_for_request_slot():
+    """Block until this thread may call OpenRouter without exceeding LLM_REQUESTS_PER_MINUTE."""
+    global _next_request_at
+    if LLM_REQUESTS_PER_MINUTE <= 0:
+        return
+    # Hand out evenly spaced start times under the lock, then sleep outside it
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_request_at)
+        _next_request_at = slot + 60.0 / LLM_REQUESTS_PER_MINUTE
+    if slot > now:
+        time.sleep(slot - now)
+
+def request_completion(prompt, label, max_tokens=LLM_MAX_TOKENS, allow_truncated=True):
+    """POST one prompt to OpenRouter; returns the reply text or an "Error:"/"API Error:" string.
+
+    With allow_truncated=False, a reply cut off at max_tokens is returned as an "Error:" string.
+    """
+    req_body = {
+        "model": OPENROUTER_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        # The answer is two sentences / 100 words; capping output bounds per-row latency and cost
+        "max_tokens": max_tokens,
+        "temperature": LLM_TEMPERATURE
+    }
+    wait_for_request_slot()
+    start_time = time.perf_counter()
+    try:
+        response = _SESSION.post(OPENROUTER_URL, data=orjson.dumps(req_body), timeout=(3.05, 60))
+    except Exception as req_exc:
+        logger.exception("Request to OpenRouter failed: %s", req_exc)
+        return "Error: Failed to call OpenRouter API"
+    elapsed = time.perf_counter() - start_time
+    logger.info("%s: OpenRouter responded %d in %.2fs", label, response.status_code, elapsed)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("OpenRouter raw response text: %s", response.text)
+    if response.status_code == 200:
+        try:
+            result = orjson.loads(response.content)
+            choice = result['choices'][0]
+            evaluation = choice['message'].get('content', '').strip()
+            truncated = choice.get('finish_reason') == 'length'
+            if truncated:
+                logger.warning("LLM output for %s hit max_tokens (%d)", label, max_tokens)
+        except Exception as parse_exc:
+            logger.exception("Failed to parse OpenRouter response: %s", parse_exc)
+            return "Error: Failed to parse OpenRouter API response"
+        if 'usage' in result:
+            logger.debug("Tokens used: %s", result['usage'].get('total_tokens', 'N/A'))
+        if truncated and not allow_truncated:
+            return f"Error: LLM output truncated at max_tokens ({max_tokens})"
+        if not evaluation:
+            logger.warning("LLM returned blank evaluation for %s", label)
+        return evaluation
+    else:
+        error = f"API Error: {response.status_code} | Text: {response.text}"
+        logger.error(error)
+        return error
+
 def evaluate_individual_feedback(row_data):
-    logger.info(f"\n{'-' * 80}")
-    logger.info(f"EVALUATING: {row_data['jira_id']}")
-    logger.info(f"{'-' * 80}")
+    logger.debug("Evaluating %s", row_data['jira_id'])
     if not OPENROUTER_API_KEY:
         logger.error("OPENROUTER_API_KEY not configured!")
         return "Error: OPENROUTER_API_KEY not configured"
     try:
-        prompt = f"""Reflexive evaluation of Jira feature prioritization.
-
-Jira ID: {row_data['jira_id']}
-Jira Summary: {row_data['summary']}
-STAR Priority: {row_data['priority']}
-Priority Rationale: {row_data['justification']}
-Feature Impact: {row_data['feature_impact']}
-Task: 
-- Write 2 sentences (max 100 words) describing any significant deviation between STAR Priority/Rationale and actual Feature Impact, and any learnings from this.
-- Do not add any headings. Do not elaborate further. Do not repeat inputs."""
-        logger.info(f"Prompt sent to LLM:\n{prompt}")
-        logger.info(f"Calling OpenRouter API...")
-        start_time = datetime.now()
-        req_body = {
-            "model": OPENROUTER_MODEL,
-            "messages": [{"role": "user", "content": prompt}]
-        }
-        try:
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "HTTP-Referer": YOUR_SITE_URL,
-                    "X-Title": YOUR_SITE_NAME,
-                    "Content-Type": "application/json"
-                },
-                data=json.dumps(req_body),
-                timeout=60
-            )
-        except Exception as req_exc:
-            logger.error(f"Request to OpenRouter failed: {req_exc}")
-            logger.error(traceback.format_exc())
-            return "Error: Failed to call OpenRouter API"
-        elapsed = (datetime.now() - start_time).total_seconds()
-        logger.info(f"Response received in {elapsed:.2f}s")
-        logger.info(f"OpenRouter raw response status: {response.status_code}")
-        logger.info(f"OpenRouter raw response text: {response.text}")
-        if response.status_code == 200:
-            try:
-                result = response.json()
-                logger.info(f"Parsed OpenRouter response JSON: {json.dumps(result, indent=2)}")
-                evaluation = result['choices'][0]['message'].get('content', '').strip()
-            except Exception as parse_exc:
-                logger.error(f"Failed to parse OpenRouter response: {parse_exc}")
-                logger.error(traceback.format_exc())
-                return "Error: Failed to parse OpenRouter API response"
-            if 'usage' in result:
-                logger.info(f"Tokens used: {result['usage'].get('total_tokens', 'N/A')}")
-            logger.info(f"LLM Evaluation (pre-trunc): {evaluation[:150]}")
-            if not evaluation:
-                logger.warning(f"LLM returned blank evaluation for {row_data['jira_id']}")
-            return evaluation
-        else:
-            error = f"API Error: {response.status_code} | Text: {response.text}"
-            logger.error(error)
-            return error
+        prompt = PROMPT_TEMPLATE.format_map(row_data)
+        logger.debug("Prompt sent to LLM:\n%s", prompt)
+        return request_completion(prompt, row_data['jira_id'])
     except Exception as e:
         error = f"Error: {str(e)}"
-        logger.error(error)
-        logger.error(traceback.format_exc())
+        logger.exception(error)
         return error
 
-def write_evaluation_to_sheet(row_index, evaluation_text):
-    logger.info(f"Writing evaluation to row {row_index}. Eval: {evaluation_text[:120]}")
-    client = get_google_sheets_client()
-    if not client:
-        logger.error("No Sheets client.")
-        return False
+def pack_prompt(rows):
+    return PACKED_PROMPT_HEADER.format(count=len(rows)) + "\n\n".join(
+        f"### {k}\n{PROMPT_TEMPLATE.format_map(row_data)}" for k, row_data in enumerate(rows, start=1)
+    )
+
+def split_packed_reply(reply, count):
+    """Split a packed reply on its "### k" markers; None unless exactly answers 1..count are present."""
+    markers = list(_PACKED_ANSWER_RE.finditer(reply))
+    if [int(m.group(1)) for m in markers] != list(range(1, count + 1)):
+        return None
+    ends = [m.start() for m in markers[1:]] + [len(reply)]
+    answers = [reply[m.end():end].strip() for m, end in zip(markers, ends)]
+    return answers if all(answers) else None
+
+def evaluate_feedback_group(rows):
+    """Evaluate up to ROWS_PER_REQUEST rows with a single OpenRouter call.
+
+    Falls back to one call per row when the packed reply is an error, was truncated at max_tokens or
+    cannot be split cleanly, so a malformed batch never attributes a summary to the wrong row.
+    """
+    if len(rows) == 1 or not OPENROUTER_API_KEY:
+        return [evaluate_individual_feedback(row_data) for row_data in rows]
+    label = f"{rows[0]['jira_id']}..{rows[-1]['jira_id']}"
     try:
-        sh = client.open(GOOGLE_SHEET)
-        worksheet = sh.get_worksheet(0)
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        worksheet.update_cell(row_index, 7, evaluation_text)   # Reflexive Summary (col G/7)
-        worksheet.update_cell(row_index, 8, 'Processed')       # wasProcessed (col H/8)
-        worksheet.update_cell(row_index, 9, timestamp)         # Timestamp (col I/9)
-        logger.info(f"✓ Written to row {row_index} at {timestamp}")
-        return True
+        prompt = pack_prompt(rows)
+        logger.debug("Packed prompt sent to LLM:\n%s", prompt)
+        reply = request_completion(
+            prompt, label, max_tokens=LLM_MAX_TOKENS * len(rows),
+            # A cut-off packed reply would leave the last row with half a summary flagged Processed
+            allow_truncated=False
+        )
+        if not is_error_evaluation(reply):
+            answers = split_packed_reply(reply, len(rows))
+            if answers is not None:
+                return answers
+            logger.warning("Packed reply for %s did not contain %d answers; retrying row by row", label, len(rows))
+        else:
+            logger.warning("Packed request for %s returned no usable reply; retrying row by row", label)
     except Exception as e:
-        logger.error(f"Error writing to sheet: {e}")
-        logger.error(traceback.format_exc())
-        return False
+        logger.error("Packed evaluation of %s failed: %s", label, e)
+    return [evaluate_individual_feedback(row_data) for row_data in rows]
+
+def build_range_updates(chunk, timestamp):
+    """One G:I batch_update entry per run of consecutive rows in a row-sorted chunk."""
+    updates = []
+    run_start = run_end = None
+    for row_index, evaluation_text in chunk:
+        # Reflexive Summary (col G/7), wasProcessed (col H/8), Timestamp (col I/9)
+        values = [evaluation_text, '' if is_error_evaluation(evaluation_text) else 'Processed', timestamp]
+        if updates and row_index == run_end + 1:
+            run_end = row_index
+            updates[-1]['range'] = f"G{run_start}:I{run_end}"
+            updates[-1]['values'].append(values)
+        else:
+            run_start = run_end = row_index
+            updates.append({"range": f"G{row_index}:I{row_index}", "values": [values]})
+    return updates
+
+def write_evaluations_to_sheet(worksheet, evaluations, timestamp):
+    """Write (row_index, evaluation_text) pairs back to the sheet, WRITE_BATCH_SIZE rows per batch_update.
+
+    Returns the row indexes that were written, so a failed chunk does not hide the ones that succeeded.
+    """
+    logger.info("Writing %d evaluations to sheet in batches of %d", len(evaluations), WRITE_BATCH_SIZE)
+    # Results arrive in completion order; sorting lets neighbouring rows share one range
+    evaluations = sorted(evaluations)
+    written = []
+    for start in range(0, len(evaluations), WRITE_BATCH_SIZE):
+        chunk = evaluations[start:start + WRITE_BATCH_SIZE]
+        try:
+            updates = build_range_updates(chunk, timestamp)
+            worksheet.batch_update(updates, value_input_option="USER_ENTERED")
+            written.extend(row_index for row_index, _ in chunk)
+            logger.info("✓ Written %d rows in %d ranges at %s", len(chunk), len(updates), timestamp)
+        except Exception as e:
+            logger.exception("Error writing to sheet: %s", e)
+    return written
+
+def sheet_writer(worksheet, write_queue, written_rows):
+    """Drain (row_index, evaluation_text) pairs from write_queue until a None sentinel arrives.
+
+    Runs on its own thread so each batch_update overlaps with the LLM calls still in flight. A batch is
+    flushed when it reaches WRITE_BATCH_SIZE rows or has waited WRITE_FLUSH_INTERVAL seconds, so
+    results reach the sheet steadily even when the run is smaller than one batch. A failed flush is
+    logged and the thread carries on, so it always runs until the sentinel.
+    """
+    pending = []
+    flush_at = None
+    while True:
+        try:
+            item = write_queue.get(timeout=None if flush_at is None else max(0.0, flush_at - time.monotonic()))
+            done = item is None
+        except queue.Empty:
+            item, done = None, False
+        if item is not None:
+            pending.append(item)
+            if flush_at is None:
+                flush_at = time.monotonic() + WRITE_FLUSH_INTERVAL
+        if pending and (done or len(pending) >= WRITE_BATCH_SIZE or time.monotonic() >= flush_at):
+            try:
+                written_rows.update(write_evaluations_to_sheet(
+                    worksheet, pending, datetime.now().strftime(TIMESTAMP_FORMAT)
+                ))
+            except Exception as e:
+                # Keep draining: the producer blocks on the bounded queue if this thread ever stops
+                logger.exception("Sheet writer dropped %d rows: %s", len(pending), e)
+            pending = []
+            flush_at = None
+        if done:
+            return
+
+@dataclass(slots=True)
+class Evaluation:
+    """One HTML report row: the sheet inputs plus their reflexive summary."""
+    jira_id: str
+    summary: str
+    priority: str
+    justification: str
+    feature_impact: str
+    feature_impact_link: str
+    reflexive_summary: str
+
+def html_safe(value):
+    return (value or '').translate(_HTML_TABLE)
 
 def generate_html_report(evaluations, output_path):
-    logger.info(f"Generating HTML report at {output_path}...")
+    logger.info("Generating HTML report at %s...", output_path)
     try:
-        html = []
-        html.append("<html><head><meta charset='UTF-8'><title>Reflexive Summary</title></head><body>")
-        html.append("<h1>LLM Reflexive Prioritization Evaluation Report</h1><table border='1' cellpadding='6' cellspacing='0'>")
-        html.append(
-            "<tr style='background:#cacaca'><th>Jira ID</th><th>Jira Summary</th><th>STAR Priority</th><th>Priority Rationale</th><th>Feature Impact</th><th>Feature Impact Link</th><th>Reflexive Summary</th></tr>"
-        )
-        for entry in evaluations:
-            eval_html = entry.get('reflexive_summary', '').replace('\n', '<br>')
-            html.append(
-                f"<tr><td>{entry.get('jira_id','')}</td>"
-                f"<td>{entry.get('summary','')}</td>"
-                f"<td>{entry.get('priority','')}</td>"
-                f"<td>{entry.get('justification','')}</td>"
-                f"<td>{entry.get('feature_impact','')}</td>"
-                f"<td>{entry.get('feature_impact_link','')}</td>"
-                f"<td>{eval_html}</td></tr>"
-            )
-        html.append("</table></body></html>")
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write('\n'.join(html))
-        logger.info(f"✓ HTML report written to {output_path}")
+        # Write rows straight to the file instead of building the whole document in memory
+        with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            f.write(REPORT_HEADER)
+            for entry in evaluations:
+                f.write(REPORT_ROW_TEMPLATE.format(
+                    jira_id=html_safe(entry.jira_id),
+                    summary=html_safe(entry.summary),
+                    priority=html_safe(entry.priority),
+                    justification=html_safe(entry.justification),
+                    feature_impact=html_safe(entry.feature_impact),
+                    feature_impact_link=html_safe(entry.feature_impact_link),
+                    reflexive_summary=html_safe(entry.reflexive_summary)
+                ))
+            f.write(REPORT_FOOTER)
+        logger.info("✓ HTML report written to %s", output_path)
     except Exception as e:
-        logger.error(f"Error generating HTML report: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error generating HTML report: %s", e)
 
 def process_all_feedback():
+    """Evaluate pending rows, write them back and publish the report; returns False if the run failed."""
     execution_start = datetime.now()
-    logger.info("\n" + "=" * 80)
-    logger.info("STARTING FEEDBACK PROCESSING")
-    logger.info("=" * 80)
-    logger.info(f"Started at: {execution_start.strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("=" * 80)
+    started_at = execution_start.strftime(TIMESTAMP_FORMAT)
+    log_configuration()
+    logger.info("Starting feedback processing at %s", started_at)
+    missing = missing_config()
+    if missing:
+        logger.error("Missing or invalid configuration: %s. Exiting before reading the sheet.", ', '.join(missing))
+        return False
     try:
-        rows_to_process = read_feedback_rows()
+        worksheet = get_feedback_worksheet()
+        if worksheet is None:
+            logger.error("No Sheets client. Exiting.")
+            return False
+        rows_to_process = read_feedback_rows(worksheet)
         if not rows_to_process:
-            logger.warning("\nNo rows to process. Exiting.")
-            return
-        logger.info("\n" + "=" * 80)
-        logger.info("PROCESSING INDIVIDUAL FEEDBACK")
-        logger.info("=" * 80)
-        processed_count = 0
-        failed_count = 0
+            logger.warning("No rows to process. Exiting.")
+            return True
+        # Rows already marked Processed in col H keep their stored summary and cost no LLM call
+        rows_to_evaluate = [r for r in rows_to_process if not r['was_processed']]
+        logger.info("Skipping %d already processed rows", len(rows_to_process) - len(rows_to_evaluate))
+        new_evaluations = {}
+        written_rows = set()
+        # Bounded so finished evaluations apply backpressure instead of piling up behind a slow sheet
+        write_queue = queue.Queue(maxsize=64)
+        writer = threading.Thread(
+            target=sheet_writer, args=(worksheet, write_queue, written_rows), name="sheet-writer", daemon=True
+        )
+        writer.start()
+        # Rows that would produce the same prompt (e.g. a ticket pasted twice) share one LLM call
+        duplicates = {}
+        for row_data in rows_to_evaluate:
+            duplicates.setdefault(tuple(row_data[field] for field in PROMPT_FIELDS), []).append(row_data)
+        unique_rows = [same_prompt[0] for same_prompt in duplicates.values()]
+        if len(unique_rows) < len(rows_to_evaluate):
+            logger.info("%d rows share a prompt with an earlier row", len(rows_to_evaluate) - len(unique_rows))
+        groups = [unique_rows[i:i + ROWS_PER_REQUEST] for i in range(0, len(unique_rows), ROWS_PER_REQUEST)]
+        # LLM calls are independent and network-bound, so evaluate rows concurrently and hand each
+        # result to the writer as soon as it lands; the report is still built in sheet order below
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, LLM_WORKERS)) as executor:
+                futures = {executor.submit(evaluate_feedback_group, group): group for group in groups}
+                idx = 0
+                for future in as_completed(futures):
+                    for unique_row, evaluation in zip(futures[future], future.result()):
+                        for row_data in duplicates[tuple(unique_row[field] for field in PROMPT_FIELDS)]:
+                            idx += 1
+                            logger.info("[%d/%d] Evaluated %s", idx, len(rows_to_evaluate), row_data['jira_id'])
+                            logger.debug("Reflexive summary produced for %s: %r", row_data['jira_id'], evaluation)
+                            new_evaluations[row_data['row_index']] = evaluation
+                            write_queue.put((row_data['row_index'], evaluation))
+        finally:
+            write_queue.put(None)
+            writer.join()
+        processed_count = len(written_rows)
+        failed_count = len(new_evaluations) - processed_count
+        new_evaluations = {r: e for r, e in new_evaluations.items() if r in written_rows}
         all_evaluations = []
-        for idx, row_data in enumerate(rows_to_process, start=1):
-            logger.info(f"\n[{idx}/{len(rows_to_process)}] Processing {row_data['jira_id']}: {row_data}")
-            evaluation = evaluate_individual_feedback(row_data)
-            logger.info(f"Reflexive summary produced for {row_data['jira_id']}: {evaluation!r}")
-            if write_evaluation_to_sheet(row_data['row_index'], evaluation):
-                processed_count += 1
-                all_evaluations.append({
-                    'jira_id': row_data['jira_id'],
-                    'summary': row_data['summary'],
-                    'priority': row_data['priority'],
-                    'justification': row_data['justification'],
-                    'feature_impact': row_data['feature_impact'],
-                    'feature_impact_link': row_data['feature_impact_link'],
-                    'reflexive_summary': evaluation
-                })
+        for row_data in rows_to_process:
+            if row_data['was_processed']:
+                evaluation = row_data['reflexive_summary']
+            elif row_data['row_index'] in new_evaluations:
+                evaluation = new_evaluations[row_data['row_index']]
             else:
-                failed_count += 1
-        logger.info("\n" + "=" * 80)
-        logger.info("INDIVIDUAL PROCESSING COMPLETE")
-        logger.info("=" * 80)
-        logger.info(f"Processed: {processed_count}/{len(rows_to_process)}")
-        logger.info(f"Failed: {failed_count}")
-        logger.info("=" * 80)
+                continue
+            all_evaluations.append(Evaluation(
+                jira_id=row_data['jira_id'],
+                summary=row_data['summary'],
+                priority=row_data['priority'],
+                justification=row_data['justification'],
+                feature_impact=row_data['feature_impact'],
+                feature_impact_link=row_data['feature_impact_link'],
+                reflexive_summary=evaluation
+            ))
         execution_end = datetime.now()
         duration = (execution_end - execution_start).total_seconds()
-        logger.info("\n" + "=" * 80)
-        logger.info("EXECUTION COMPLETE")
-        logger.info("=" * 80)
-        logger.info(f"Started: {execution_start.strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"Ended: {execution_end.strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"Duration: {duration:.2f} seconds")
-        logger.info(f"Total rows processed: {processed_count}")
-        logger.info("=" * 80)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("=" * 80)
+            logger.info("EXECUTION COMPLETE")
+            logger.info("=" * 80)
+            logger.info("Processed: %d/%d", processed_count, len(rows_to_evaluate))
+            logger.info("Failed: %d", failed_count)
+            logger.info("Started: %s", started_at)
+            logger.info("Ended: %s", execution_end.strftime(TIMESTAMP_FORMAT))
+            logger.info("Duration: %.2f seconds", duration)
+            logger.info("=" * 80)
         docs_dir = "docs"
         os.makedirs(docs_dir, exist_ok=True)
         html_report_path = os.path.join(
             docs_dir,
-            f"llm_evaluation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+            f"llm_evaluation_report_{execution_end.strftime('%Y%m%d_%H%M%S')}.html"
         )
         generate_html_report(all_evaluations, html_report_path)
         import shutil
         shutil.copyfile(html_report_path, os.path.join(docs_dir, "latest_report.html"))
-        logger.info(f"HTML report(s) generated! Publish (commit/push) to GitHub Pages or static host.")
+        logger.info("HTML report(s) generated! Publish (commit/push) to GitHub Pages or static host.")
+        return True
     except Exception as e:
-        logger.error(f"Fatal error in process_all_feedback: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Fatal error in process_all_feedback: %s", e)
+        return False
 
 if __name__ == "__main__":
-    process_all_feedback()
+    sys.exit(0 if process_all_feedback() else 1)
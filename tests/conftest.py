@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Keep test runs off disk and away from real credentials; process_feedback reads these at import
+os.environ['LOG_FILE'] = ''
+for name in ('GOOGLE_CREDENTIALS_JSON', 'GOOGLE_CREDS_JSON', 'OPENROUTER_API_KEY'):
+    os.environ.pop(name, None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,168 @@
+import queue
+import threading
+import types
+
+from urllib3 import HTTPResponse
+
+import process_feedback
+
+
+def test_split_packed_reply_in_order():
+    reply = "Here you go.\n### 1\nFirst answer.\n### 2: Second answer.\n"
+    assert process_feedback.split_packed_reply(reply, 2) == ["First answer.", "Second answer."]
+
+
+def test_split_packed_reply_out_of_order():
+    reply = "### 2\nSecond answer.\n### 1\nFirst answer.\n"
+    assert process_feedback.split_packed_reply(reply, 2) is None
+
+
+def test_split_packed_reply_missing_answer():
+    reply = "### 1\nFirst answer.\n### 3\nThird answer.\n"
+    assert process_feedback.split_packed_reply(reply, 3) is None
+
+
+def test_split_packed_reply_extra_answer():
+    reply = "### 1\nFirst answer.\n### 2\nSecond answer.\n"
+    assert process_feedback.split_packed_reply(reply, 1) is None
+
+
+def test_split_packed_reply_empty_answer():
+    reply = "### 1\n\n### 2\nSecond answer.\n"
+    assert process_feedback.split_packed_reply(reply, 2) is None
+
+
+def test_split_packed_reply_numbered_content_is_not_a_marker():
+    reply = "### 1\n2 teams shipped late.\n###\n3 weeks of slip.\n### 2\n1. Impact was lower than rated.\n"
+    assert process_feedback.split_packed_reply(reply, 2) == [
+        "2 teams shipped late.\n###\n3 weeks of slip.",
+        "1. Impact was lower than rated.",
+    ]
+
+
+class FakeWorksheet:
+    def __init__(self):
+        self.updates = []
+        self.flushed = threading.Event()
+
+    def batch_update(self, updates, value_input_option=None):
+        self.updates.extend(updates)
+        self.flushed.set()
+
+
+def make_row(row_index, jira_id):
+    return {
+        'row_index': row_index,
+        'jira_id': jira_id,
+        'summary': 'Checkout redesign',
+        'priority': 'High',
+        'justification': 'Conversion',
+        'feature_impact': 'Lower than expected',
+        'feature_impact_link': '',
+        'was_processed': False,
+        'reflexive_summary': '',
+    }
+
+
+def run_with_rows(monkeypatch, tmp_path, rows, reply):
+    worksheet = FakeWorksheet()
+    groups = []
+
+    def fake_evaluate(group):
+        groups.append([row_data['row_index'] for row_data in group])
+        return [reply(row_data) for row_data in group]
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(process_feedback, 'missing_config', lambda: [])
+    monkeypatch.setattr(process_feedback, 'get_feedback_worksheet', lambda: worksheet)
+    monkeypatch.setattr(process_feedback, 'read_feedback_rows', lambda _: rows)
+    monkeypatch.setattr(process_feedback, 'evaluate_feedback_group', fake_evaluate)
+    assert process_feedback.process_all_feedback()
+    return worksheet.updates, groups
+
+
+def test_identical_prompts_share_one_evaluation(monkeypatch, tmp_path):
+    rows = [make_row(2, 'JIRA-1'), make_row(3, 'JIRA-1'), make_row(4, 'JIRA-2')]
+    updates, groups = run_with_rows(monkeypatch, tmp_path, rows, lambda row_data: f"Summary for {row_data['jira_id']}")
+
+    assert sorted(index for group in groups for index in group) == [2, 4]
+    assert [update['range'] for update in updates] == ['G2:I4']
+    assert [values[:2] for values in updates[0]['values']] == [
+        ['Summary for JIRA-1', 'Processed'],
+        ['Summary for JIRA-1', 'Processed'],
+        ['Summary for JIRA-2', 'Processed'],
+    ]
+
+
+def test_shared_error_reply_leaves_every_duplicate_unprocessed(monkeypatch, tmp_path):
+    rows = [make_row(2, 'JIRA-1'), make_row(5, 'JIRA-1')]
+    updates, groups = run_with_rows(monkeypatch, tmp_path, rows, lambda _: "API Error: 500 | Text: boom")
+
+    assert groups == [[2]]
+    assert [update['range'] for update in updates] == ['G2:I2', 'G5:I5']
+    for update in updates:
+        assert update['values'][0][:2] == ["API Error: 500 | Text: boom", '']
+
+
+def test_sheet_writer_flushes_partial_batch_after_interval_and_on_sentinel(monkeypatch):
+    # The writer reads a clock the test controls, so the flush deadline never passes on its own
+    now = [0.0]
+    monkeypatch.setattr(process_feedback, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(process_feedback, 'WRITE_BATCH_SIZE', 10)
+    monkeypatch.setattr(process_feedback, 'WRITE_FLUSH_INTERVAL', 0.05)
+    worksheet = FakeWorksheet()
+    write_queue = queue.Queue()
+    written_rows = set()
+    writer = threading.Thread(target=process_feedback.sheet_writer, args=(worksheet, write_queue, written_rows))
+    writer.start()
+
+    write_queue.put((2, 'First'))
+    write_queue.put((3, 'Second'))
+    assert not worksheet.flushed.wait(timeout=0.3)
+    assert worksheet.updates == []
+
+    now[0] = 1.0
+    assert worksheet.flushed.wait(timeout=5)
+    assert [update['range'] for update in worksheet.updates] == ['G2:I3']
+    assert written_rows == {2, 3}
+
+    write_queue.put((7, 'Third'))
+    write_queue.put(None)
+    writer.join(timeout=5)
+    assert not writer.is_alive()
+    assert [update['range'] for update in worksheet.updates] == ['G2:I3', 'G7:I7']
+    assert written_rows == {2, 3, 7}
+
+
+def test_sheet_writer_keeps_draining_after_a_failed_flush(monkeypatch):
+    def broken_write(worksheet, evaluations, timestamp):
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(process_feedback, 'write_evaluations_to_sheet', broken_write)
+    monkeypatch.setattr(process_feedback, 'WRITE_BATCH_SIZE', 1)
+    write_queue = queue.Queue(maxsize=1)
+    written_rows = set()
+    writer = threading.Thread(target=process_feedback.sheet_writer, args=(FakeWorksheet(), write_queue, written_rows))
+    writer.start()
+
+    # With maxsize=1 each put only returns once the writer has taken the previous item
+    for row_index in range(2, 6):
+        write_queue.put((row_index, 'Summary'), timeout=5)
+    write_queue.put(None, timeout=5)
+    writer.join(timeout=5)
+    assert not writer.is_alive()
+    assert written_rows == set()
+
+
+def test_retry_after_is_capped_at_backoff_max():
+    retry = process_feedback.CappedRetry(total=3, backoff_max=30)
+    response = HTTPResponse(status=429, headers={'Retry-After': '600'})
+    assert retry.get_retry_after(response) == 30
+
+
+def test_openrouter_retries_take_a_rate_limit_slot(monkeypatch):
+    slots = []
+    monkeypatch.setattr(process_feedback, 'wait_for_request_slot', lambda: slots.append(1))
+    retry = process_feedback.OpenRouterRetry(total=3, backoff_max=30)
+    retry.sleep(HTTPResponse(status=429, headers={'Retry-After': '0'}))
+    assert slots == [1]